@@ -1,3 +1,3 @@
 """Zestify backend package."""
 
-__version__ = "0.1.0" 
\ No newline at end of file
+__version__ = "0.1.0"
@@ -0,0 +1,7 @@
+"""Shared settings for the Zestify backend."""
+
+import os
+from pathlib import Path
+
+# Where derived data (rendered overviews, model lists, parsed memory) is cached between CLI runs
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser() / "zestify"
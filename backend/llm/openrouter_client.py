@@ -86,6 +86,11 @@ class OpenRouterClient:
         logger.debug(f"Initialized with model ID: {self.default_model}")
         
         self.session = requests.Session()
+        # The chat command queries several models at once through one shared client;
+        # size the keep-alive pool so parallel requests don't open throwaway connections
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -93,19 +98,31 @@ class OpenRouterClient:
             "X-Title": "Zestify"  # Update with your app's name
         })
     
-    def list_models(self) -> Dict[str, Any]:
+    def list_models(self, etag: Optional[str] = None) -> Dict[str, Any]:
         """
         List available models on OpenRouter.
-        
+
+        Args:
+            etag: ETag of a previously fetched list; if the list hasn't changed
+                since, the server can skip resending it
+
         Returns:
-            Dict containing available models and their information.
+            Dict containing available models and their information, plus the
+            response's "etag" when the server sent one. {"not_modified": True}
+            if the list matching `etag` is still current.
         """
         url = f"{self.BASE_URL}/models"
-        
+        headers = {"If-None-Match": etag} if etag else None
+
         try:
-            response = self.session.get(url)
+            response = self.session.get(url, headers=headers)
+            if response.status_code == 304:
+                return {"not_modified": True}
             response.raise_for_status()
-            return response.json()
+            result = response.json()
+            if response.headers.get("ETag"):
+                result["etag"] = response.headers["ETag"]
+            return result
         except requests.exceptions.RequestException as e:
             logger.error(f"Error listing models: {e}")
             return {"error": str(e)}
@@ -146,7 +163,7 @@ class OpenRouterClient:
                 # Otherwise use it directly (assuming it's already a valid model ID)
                 model_to_use = model
         
-        logger.debug(f"Using OpenRouter model ID: {model_to_use}")
+        logger.debug("Using OpenRouter model ID: %s", model_to_use)
         
         payload = {
             "model": model_to_use,
@@ -156,30 +173,32 @@ class OpenRouterClient:
             "stream": stream
         }
 
-        logger.debug(f"Using model ID: {payload['model']}")
+        logger.debug("Using model ID: %s", payload['model'])
         
-        # For debugging, limit the content display length in logs but show message count
-        debug_messages = []
-        for msg in messages:
-            content = msg.get('content', '')
-            content_preview = content[:100] + "..." if len(content) > 100 else content
-            debug_messages.append({
-                "role": msg.get('role', 'unknown'),
-                "content_length": len(content),
-                "content_preview": content_preview
-            })
-        
-        logger.debug(f"Sending {len(messages)} messages to OpenRouter:")
-        for i, msg in enumerate(debug_messages):
-            logger.debug(f"  Message {i+1}: role={msg['role']}, length={msg['content_length']}")
-            logger.debug(f"    Preview: {msg['content_preview']}")
+        # For debugging, limit the content display length in logs but show message count.
+        # Skipped entirely unless debug logging is on, since it walks every message
+        if logger.isEnabledFor(logging.DEBUG):
+            debug_messages = []
+            for msg in messages:
+                content = msg.get('content', '')
+                content_preview = content[:100] + "..." if len(content) > 100 else content
+                debug_messages.append({
+                    "role": msg.get('role', 'unknown'),
+                    "content_length": len(content),
+                    "content_preview": content_preview
+                })
+
+            logger.debug("Sending %d messages to OpenRouter:", len(messages))
+            for i, msg in enumerate(debug_messages):
+                logger.debug("  Message %d: role=%s, length=%d", i + 1, msg['role'], msg['content_length'])
+                logger.debug("    Preview: %s", msg['content_preview'])
         
         # Add any additional parameters
         if additional_params:
             payload.update(additional_params)
         
         try:
-            logger.debug(f"Making API request to: {url}")
+            logger.debug("Making API request to: %s", url)
             if stream:
                 response = self.session.post(url, json=payload, stream=True)
                 response.raise_for_status()
@@ -188,8 +207,8 @@ class OpenRouterClient:
                 response = self.session.post(url, json=payload)
                 
                 # Log response status and headers before raising exception
-                logger.debug(f"Response status code: {response.status_code}")
-                logger.debug(f"Response headers: {response.headers}")
+                logger.debug("Response status code: %s", response.status_code)
+                logger.debug("Response headers: %s", response.headers)
                 
                 # For 4xx/5xx responses, log more details
                 if not response.ok:
@@ -1,15 +1,40 @@
 import os
 import json
+import hashlib
 import logging
-from typing import Dict, Any, Union, List, Optional, Annotated, Callable
+import pickle
+from functools import lru_cache
+from typing import Dict, Any, Union, List, Optional, Annotated, Callable, Tuple
 from datetime import datetime, timedelta, date
 from pathlib import Path
 import jsonpatch
+from backend import __version__
+from backend.config import CACHE_DIR
+from backend.memory import schemas as memory_schemas
 from backend.memory.schemas import OverallMemory, CompactOverallMemory, Activities
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=None)
+def memory_cache_tag() -> str:
+    """
+    Tag for caches of data derived from memory files.
+
+    Changes with the package version, the memory schemas and the source of the
+    modules that load, compact and render memory, so cached results rendered
+    or pickled by older code are not reused.
+    """
+    digest = hashlib.sha256(__version__.encode())
+    digest.update(json.dumps(
+        [OverallMemory.model_json_schema(), CompactOverallMemory.model_json_schema()],
+        sort_keys=True,
+    ).encode())
+    for module_file in (memory_schemas.__file__, __file__):
+        with open(module_file, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
 def json_serial(obj):
     if isinstance(obj, datetime):
         return obj.isoformat()
@@ -21,6 +46,8 @@ class MemoryManager:
     def __init__(self, user_id: str, data_dir: str = "data"):
         self.user_id = user_id
         self.user_dir = Path(data_dir) / user_id
+        # Last rendered LLM view and the memory state it was rendered from
+        self._memory_view: Optional[Tuple[Any, str]] = None
         # Create the directory if it doesn't exist, instead of raising an error
         if not self.user_dir.is_dir():
             try:
@@ -60,6 +87,22 @@ class MemoryManager:
         # Pass user_id to from_user_dir to help initialize UserProfile if needed
         return OverallMemory.from_user_dir(self.user_dir, self.user_id)
 
+    def source_fingerprint(self) -> Tuple[Tuple[str, int, int], ...]:
+        """
+        Name, mtime and size of every memory file for this user.
+
+        Cheap to compute (no file contents are read) and changes whenever a
+        memory file is written, added or removed, so it can key caches of
+        anything derived from the user's memory.
+        """
+        if not self.user_dir.is_dir():
+            return ()
+        entries = []
+        for path in self.user_dir.glob("*.json"):
+            st = path.stat()
+            entries.append((path.name, st.st_mtime_ns, st.st_size))
+        return tuple(sorted(entries))
+
     def get_compact_memory(self) -> CompactOverallMemory:
         """
         Load memory and convert it to a compact version suitable for LLM consumption
@@ -108,20 +151,20 @@ class MemoryManager:
             for i, op in enumerate(patch):
                 op_type = op.get('op', 'unknown')
                 path = op.get('path', 'unknown')
-                value_preview = str(op.get('value', ''))[:50]
-                if len(str(op.get('value', ''))) > 50:
-                    value_preview += "..."
+                value = str(op.get('value', ''))
+                value_preview = value[:50] + "..." if len(value) > 50 else value
                 logger.info(f"  Operation {i+1}: {op_type} {path} = {value_preview}")
 
             # Apply patch to memory dictionary representation
             # Check if memory is a Pydantic model or a dict
+            patch_obj = jsonpatch.JsonPatch(patch)
             if hasattr(memory, 'model_dump'):
-                memory_dict = memory.model_dump()
+                # The dump is ours, so patch it in place rather than deep-copying
+                # the whole memory first
+                patched_memory_dict = patch_obj.apply(memory.model_dump(), in_place=True)
             else:
-                # If it's already a dict, use it directly
-                memory_dict = memory
-            patch_obj = jsonpatch.JsonPatch(patch)
-            patched_memory_dict = patch_obj.apply(memory_dict)
+                # If it's already a dict, leave the caller's copy untouched
+                patched_memory_dict = patch_obj.apply(memory)
 
             # Track which components were modified to save them individually later
             modified_components = self._identify_modified_components(patch)
@@ -248,8 +291,18 @@ class MemoryManager:
         Returns:
             Formatted string representation of memory for LLM consumption
         """
+        # Chat history isn't part of the view but is rewritten on every turn, so it
+        # is left out of the key; the date is in it because the view is rendered
+        # relative to today
+        key = (date.today(), tuple(entry for entry in self.source_fingerprint()
+                                   if entry[0] != "chat_history.json"))
+        if self._memory_view is not None and self._memory_view[0] == key:
+            return self._memory_view[1]
+
         memory = self.load_memory()
-        return memory.get_llm_view()
+        view = memory.get_llm_view()
+        self._memory_view = (key, view)
+        return view
 
     def add_message(self, message: Any) -> None:
         """
@@ -311,10 +364,43 @@ class OverviewMemoryManager(MemoryManager):
         return memory
 
     def get_compact_memory(self) -> CompactOverallMemory:
+        # Parsing and compacting a large memory is slow, so the result is pickled
+        # and reused across CLI runs until one of the user's memory files, the
+        # package version or the memory schemas change
+        cache_file = CACHE_DIR / "memory" / f"{self.user_id}.compact.pkl"
+        key = (memory_cache_tag(), str(self.user_dir.resolve()), self.source_fingerprint())
+        try:
+            with open(cache_file, "rb") as f:
+                # The key is pickled on its own ahead of the memory, so a cache
+                # written by other code or schemas is never unpickled
+                if pickle.load(f) == key:
+                    return pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            # Truncated, corrupt or no longer unpicklable (e.g. after a pydantic
+            # or model class change): drop the cache file and rebuild it
+            logger.debug(f"Discarding compact memory cache {cache_file}: {e!r}")
+            try:
+                cache_file.unlink()
+            except OSError:
+                pass
+
         # Load the full memory first (load_memory no longer filters)
         memory = self.load_memory()
         # Convert the full memory to compact
-        return memory.to_compact()
+        compact = memory.to_compact()
+
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_file, "wb") as f:
+                pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(compact, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.debug(f"Could not write compact memory cache {cache_file}: {e}")
+        return compact
 
     # Removed the _date_in_range helper method as it's no longer used here
     # def _date_in_range(...) -> bool:
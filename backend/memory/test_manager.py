@@ -0,0 +1,57 @@
+# test_manager.py
+import pickle
+
+import backend.memory.manager as manager
+from backend.memory.manager import OverviewMemoryManager
+from backend.memory.schemas import CompactOverallMemory, OverallMemory
+
+
+def compact_cache(tmp_path, monkeypatch):
+    """An OverviewMemoryManager with its cache under tmp_path, counting compactions."""
+    monkeypatch.setattr(manager, "CACHE_DIR", tmp_path / "cache")
+    compactions = []
+
+    def to_compact(self):
+        compactions.append(self)
+        return CompactOverallMemory.model_construct()
+
+    monkeypatch.setattr(OverallMemory, "to_compact", to_compact)
+    mm = OverviewMemoryManager("testuser", data_dir=str(tmp_path / "data"))
+    return mm, tmp_path / "cache" / "memory" / "testuser.compact.pkl", compactions
+
+
+def test_compact_memory_is_cached(tmp_path, monkeypatch):
+    mm, cache_file, compactions = compact_cache(tmp_path, monkeypatch)
+    mm.get_compact_memory()
+    assert cache_file.exists()
+    mm.get_compact_memory()
+    assert len(compactions) == 1
+
+
+def test_unloadable_compact_memory_cache_is_rebuilt(tmp_path, monkeypatch):
+    mm, cache_file, compactions = compact_cache(tmp_path, monkeypatch)
+    mm.get_compact_memory()
+    with open(cache_file, "rb") as f:
+        key = pickle.load(f)
+
+    broken_payloads = [
+        # A class that no longer exists, as after a model rename
+        pickle.dumps(key) + b"cbackend.memory.schemas\nNoSuchModel\n.",
+        # Truncated in the middle of the key
+        pickle.dumps(key)[:10],
+        b"",
+    ]
+    for payload in broken_payloads:
+        cache_file.write_bytes(payload)
+        assert isinstance(mm.get_compact_memory(), CompactOverallMemory)
+        # The bad file was replaced by a working cache
+        mm.get_compact_memory()
+    assert len(compactions) == 1 + len(broken_payloads)
+
+
+def test_compact_memory_cache_tracks_code_changes(tmp_path, monkeypatch):
+    mm, cache_file, compactions = compact_cache(tmp_path, monkeypatch)
+    mm.get_compact_memory()
+    monkeypatch.setattr(manager, "memory_cache_tag", lambda: "other code")
+    mm.get_compact_memory()
+    assert len(compactions) == 2
@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Any
+from typing import ClassVar, Dict, List, Optional, Any
 from enum import Enum
 from pydantic import BaseModel, Field, ConfigDict
 import json
@@ -12,7 +12,7 @@ import uuid
 from backend.memory.schemas import OverallMemory
 from backend.memory.manager import MemoryManager
 from backend.llm.openrouter_client import OpenRouterClient, MODELS
-from backend.prompts.system_prompts import get_system_prompt
+from backend.prompts.system_prompts import get_system_prompt, SHARED_PREFIX
 
 # Configure logging
 logging.basicConfig(
@@ -63,10 +63,21 @@ class Chat(BaseModel):
     max_messages: int = 20
     debug: bool = False
 
+    # One OpenRouter client shared by every Chat, so its pooled HTTP session
+    # survives across turns and conversations instead of reconnecting each time
+    _client: ClassVar[Optional[OpenRouterClient]] = None
+
     def __init__(self, **data):
         # Simple initialization - memory_manager is now required
         super().__init__(**data)
 
+    @classmethod
+    def get_client(cls) -> OpenRouterClient:
+        """Return the shared OpenRouter client, creating it on first use."""
+        if Chat._client is None:
+            Chat._client = OpenRouterClient()
+        return Chat._client
+
 
     @property
     def system_prompt(self) -> str:
@@ -96,8 +107,11 @@ class Chat(BaseModel):
         formatted_messages = self.format_prompt()
 
         if self.debug:
-            logger.debug(f"System prompt: {formatted_messages[0]['content']}")
-            logger.debug(f"Token count for system prompt: {count_tokens(formatted_messages[0]['content'], self.model)}")
+            system_content = formatted_messages[0]['content']
+            if isinstance(system_content, list):
+                system_content = "".join(part["text"] for part in system_content)
+            logger.debug(f"System prompt: {system_content}")
+            logger.debug(f"Token count for system prompt: {count_tokens(system_content, self.model)}")
             return {}
 
 
@@ -111,7 +125,7 @@ class Chat(BaseModel):
         self._add_to_chat_history("user", user_input)
 
         # Generate response using the appropriate model
-        client = OpenRouterClient()
+        client = self.get_client()
         result = client.chat_completion(
             model=self.model,
             messages=formatted_messages,
@@ -137,7 +151,7 @@ class Chat(BaseModel):
         return parsed_response
 
 
-    def format_prompt(self) -> List[Dict[str, str]]:
+    def format_prompt(self) -> List[Dict[str, Any]]:
         """
         Format the current conversation state into a prompt for the LLM using the new view.
 
@@ -148,9 +162,21 @@ class Chat(BaseModel):
         memory_view_str = self.memory_manager.get_memory_view()
 
         # Create system message with context using the view string
+        system_prompt = self.system_prompt
+        state_summary = f"\n\nCURRENT STATE SUMMARY:\n{memory_view_str}"
+        if system_prompt.startswith(SHARED_PREFIX) and MODELS.get(self.model, self.model).startswith("anthropic/"):
+            # Mark the task-independent prefix as cacheable so chat and onboarding
+            # sessions share one provider cache entry; only the tail is re-processed.
+            system_content = [
+                {"type": "text", "text": SHARED_PREFIX, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": system_prompt[len(SHARED_PREFIX):] + state_summary},
+            ]
+        else:
+            system_content = system_prompt + state_summary
+
         system_message = {
             "role": "system",
-            "content": f"{self.system_prompt}\n\nCURRENT STATE SUMMARY:\n{memory_view_str}"
+            "content": system_content
         }
 
         # Format conversation messages
@@ -176,16 +202,10 @@ class Chat(BaseModel):
             logger.info("No memory patch to apply")
             return False
 
-        # Load current memory, apply patch, and save
+        # Load current memory and apply the patch; the memory manager saves the
+        # components the patch touched
         memory = self.memory_manager.load_memory()
-        memory_dict = memory.model_dump()
-
-        # Apply the patch
-        updated_memory = self.memory_manager.apply_json_patch(memory_dict, patch)
-        if updated_memory:
-            self.memory_manager.save()
-            return True
-        return False
+        return bool(self.memory_manager.apply_json_patch(memory, patch))
 
 
 
@@ -287,19 +307,18 @@ class Onboarding(Chat):
     model: str = "claude"  # Default model for onboarding
     task: str = "onboarding"  # Uses onboarding-specific prompts
 
-    def chat(self, user_input: str, system_prompt: Optional[str] = None) -> LLMResponse:
+    def chat(self, user_input: str) -> LLMResponse:
         """
         Process user input specifically for onboarding, with focus on health and workout information.
 
         Args:
             user_input: The user's message
-            system_prompt: Optional system prompt override
 
         Returns:
             LLMResponse object with the assistant's message and metadata
         """
         # Use the parent class implementation
-        result = super().chat(user_input, system_prompt)
+        result = super().chat(user_input)
 
         # Log onboarding-specific information
         self._log_onboarding_updates(result)
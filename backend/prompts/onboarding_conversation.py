@@ -1,17 +1,18 @@
-from typing import Dict, List, Optional
+from __future__ import annotations
+
 from pydantic import BaseModel, Field
 
 class ConversationChoice(BaseModel):
     label: str = Field(..., description="Display text for the choice")
     value: str = Field(..., description="Internal value for the choice")
-    description: Optional[str] = Field(None, description="Optional description or context for the choice")
+    description: str | None = Field(None, description="Optional description or context for the choice")
 
 class ConversationTurn(BaseModel):
     question: str = Field(..., description="The question to ask the user")
-    choices: Optional[List[ConversationChoice]] = Field(None, description="Optional list of choices for the user")
+    choices: list[ConversationChoice] | None = Field(None, description="Optional list of choices for the user")
     response_type: str = Field(..., description="Expected type of response: choice, text, number, or datetime")
     profile_key: str = Field(..., description="The key in the user profile to update with the response")
-    validation_rules: Optional[Dict] = Field(None, description="Optional validation rules for the response")
+    validation_rules: dict | None = Field(None, description="Optional validation rules for the response")
 
 SYSTEM_PROMPT = """You are an AI fitness coach conducting an onboarding conversation with a new user. Your goal is to gather essential information to create their fitness profile while keeping the conversation engaging and natural. Follow these guidelines:
 
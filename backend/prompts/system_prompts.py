@@ -3,13 +3,15 @@ System prompts for different models and tasks.
 Each prompt is versioned and can be selected based on the model and task.
 """
 
-from typing import Dict, Any, Optional
+from functools import lru_cache
 
 # --- New Prompt Structure ---
-# 1. ROLE AND PURPOSE: Defines the AI's persona and objective.
-# 2. CONTEXT: Explains the CURRENT STATE SUMMARY provided in the user message.
-# 3. MEMORY SCHEMA & UPDATES: Describes the target JSON structure and how to modify it using memory_patch.
-# 4. RESPONSE FORMAT: Specifies the required JSON output format (message, memory_patch, options).
+# Shared prefix (identical for every task):
+# 1. MEMORY SCHEMA & UPDATES: Describes the target JSON structure and how to modify it using memory_patch.
+# 2. RESPONSE FORMAT: Specifies the required JSON output format (message, memory_patch, options).
+# Task-specific tail:
+# 3. ROLE AND PURPOSE: Defines the AI's persona and objective.
+# 4. CONTEXT: Explains the CURRENT STATE SUMMARY provided in the user message.
 # 5. TASK-SPECIFIC GUIDELINES: Additional instructions for specific tasks (e.g., onboarding).
 
 # --- Memory Schema Description (Common to all prompts) ---
@@ -137,8 +139,18 @@ You **MUST** respond with a valid JSON object containing the following fields:
 ```
 """
 
-# --- Base Chat Prompt --- 
-BASE_CHAT_PROMPT = f"""
+# --- Shared Prefix (Common to all prompts) ---
+# Every task prompt starts with this exact text so providers that cache by prefix
+# (e.g. Anthropic prompt caching) reuse one cache entry across chat and onboarding.
+# Only the short task-specific tail appended below is re-processed on a mode switch.
+SHARED_PREFIX = f"""
+{MEMORY_SCHEMA_DESCRIPTION}
+
+{RESPONSE_FORMAT}
+"""
+
+# --- Chat Tail ---
+CHAT_TAIL = """
 # ROLE AND PURPOSE
 - You are a supportive and knowledgeable health and fitness AI coach.
 - Engage in helpful conversation, answer questions, provide guidance, and help the user stay motivated.
@@ -148,14 +160,10 @@ BASE_CHAT_PROMPT = f"""
 # CONTEXT
 - The `Memory` section below provides a text overview of the user's profile, health, activities, and goals.
 - Use this summary, along with the recent conversation history, to understand the user's situation.
-
-{MEMORY_SCHEMA_DESCRIPTION}
-
-{RESPONSE_FORMAT}
 """
 
-# --- Onboarding Prompt --- 
-ONBOARDING_PROMPT = f"""
+# --- Onboarding Tail ---
+ONBOARDING_TAIL = """
 # ROLE AND PURPOSE
 - You are an AI health coach conducting an initial onboarding session.
 - Your goal is to gather key information to build the user's profile.
@@ -166,10 +174,6 @@ ONBOARDING_PROMPT = f"""
 - The `CURRENT STATE SUMMARY` provides the information gathered *so far*.
 - Use this summary to see what information is still needed.
 
-{MEMORY_SCHEMA_DESCRIPTION}
-
-{RESPONSE_FORMAT}
-
 # ONBOARDING GUIDELINES
 - Prioritize gathering: demographics (age, height, weight), medical conditions/allergies, fitness goals, activity preferences (likes/dislikes, time, location), and general workout experience/history.
 - When appropriate, offer multiple-choice `options` in your response to make it easier for the user.
@@ -178,6 +182,10 @@ ONBOARDING_PROMPT = f"""
 - End the onboarding process when you have a reasonable baseline of information across the key areas mentioned above.
 """
 
+# --- Full Prompts (shared prefix + task tail) ---
+BASE_CHAT_PROMPT = SHARED_PREFIX + CHAT_TAIL
+ONBOARDING_PROMPT = SHARED_PREFIX + ONBOARDING_TAIL
+
 # Mapping (Using the new prompt variables)
 PROMPTS = {
     ("deepseek", "chat"): BASE_CHAT_PROMPT,
@@ -190,9 +198,13 @@ PROMPTS = {
     ("default", "onboarding"): ONBOARDING_PROMPT,
 }
 
+@lru_cache(maxsize=128)
 def get_system_prompt(model: str = "default", task: str = "chat") -> str:
     """
     Get the appropriate system prompt for the given model and task.
+
+    Results are memoized per (model, task): prompts are immutable module
+    constants, so repeated lookups skip the lowercasing and fallback chain.
     """
     key = (model.lower(), task.lower())
     prompt = PROMPTS.get(key)
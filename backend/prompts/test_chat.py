@@ -0,0 +1,32 @@
+# test_chat.py
+import json
+
+from backend.memory.manager import MemoryManager
+from backend.prompts.chat import Chat, LLMResponse, Onboarding
+from backend.services.cli import _normalize_response
+
+
+class FakeClient:
+    """Stands in for OpenRouterClient and returns a canned onboarding reply."""
+
+    def __init__(self):
+        self.calls = []
+
+    def chat_completion(self, model, messages):
+        self.calls.append(messages)
+        content = json.dumps({"message": "Welcome!", "options": ["Lose weight", "Build muscle"]})
+        return {"choices": [{"message": {"content": content}}], "usage": {"completion_tokens": 7}}
+
+
+def test_onboarding_greeting(tmp_path, monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(Chat, "_client", client)
+    mm = MemoryManager("testuser", data_dir=str(tmp_path))
+    onboarding = Onboarding(memory_manager=mm, model="claude")
+
+    response = _normalize_response(onboarding.chat("Start onboarding"))
+
+    assert response["message"] == "Welcome!"
+    assert response["options"] == ["Lose weight", "Build muscle"]
+    assert client.calls[0][-1] == {"role": "user", "content": "Start onboarding"}
+    assert isinstance(onboarding.chat("Build muscle"), LLMResponse)
@@ -4,33 +4,88 @@ import os
 import logging
 import click
 from pathlib import Path
-from dotenv import load_dotenv
-from datetime import datetime
+from typing import Any, Dict, Optional
 
-# Load environment variables from .env file
-env_path = Path('.') / '.env'
-load_dotenv(dotenv_path=env_path)
+logger = logging.getLogger(__name__)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+# Model keys accepted by the chat commands, in display order
+MODEL_CHOICES = (
+    'gemini', 'gemini-pro', 'gemini-flash', 'gemini-thinking',
+    'deepseek', 'deepseek-v3', 'deepseek-r1', 'deepseek-r1-zero',
+    'claude', 'claude-3.7-sonnet', 'claude-3.5-sonnet', 'claude-3-opus',
+    'gpt-4', 'gpt-4o', 'gpt-4.1',
 )
-logger = logging.getLogger(__name__)
+VALID_MODELS = frozenset(MODEL_CHOICES)
+
+# How long (seconds) list-models reuses its cached copy of the OpenRouter model list
+MODELS_CACHE_TTL = 3600
+
+# Inputs that end a chat session (compared case-insensitively)
+EXIT_COMMANDS = frozenset({'exit', 'quit', 'q'})
+
+# Color used for each model's responses in chat
+MODEL_COLORS = {
+    'deepseek': 'blue',
+    'deepseek-v3': 'blue',
+    'deepseek-r1': 'cyan',
+    'deepseek-r1-zero': 'cyan',
+    'claude': 'magenta',
+    'claude-3.7-sonnet': 'magenta',
+    'claude-3.5-sonnet': 'bright_magenta',
+    'claude-3-opus': 'bright_magenta',
+    'gemini': 'green',
+    'gemini-pro': 'bright_green',
+    'gemini-flash': 'green',
+    'gemini-thinking': 'bright_green',
+    'gpt-4': 'yellow',
+    'gpt-4o': 'bright_yellow',
+    'gpt-4.1': 'yellow'
+}
+
+
+_env_loaded = False
+
+
+def _init_env(debug: bool = False) -> None:
+    """
+    Load the .env file and configure logging for commands that need them.
+
+    Done lazily rather than at import time so that `--help` and commands that
+    only print don't pay for it. Safe to call more than once.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+
+        # Load environment variables from .env file
+        load_dotenv(dotenv_path=Path('.') / '.env')
+        _env_loaded = True
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    if debug:
+        # Set root logger to DEBUG for all components
+        logging.getLogger().setLevel(logging.DEBUG)
+        # Make sure our specific loggers are set to DEBUG as well
+        logging.getLogger('backend').setLevel(logging.DEBUG)
+        logger.setLevel(logging.DEBUG)
+        logger.debug("Debug mode enabled - verbose logging activated")
 
 @click.group()
 @click.version_option(version="0.1.0")
-def cli():
+@click.pass_context
+def cli(ctx: click.Context):
     """Zestify - Your AI-powered wellness companion."""
-    pass
+    # click already drops styling when output isn't a terminal; NO_COLOR
+    # (https://no-color.org) turns it off on terminals too
+    if os.environ.get("NO_COLOR"):
+        ctx.color = False
 
 @cli.command()
 @click.option('--debug', is_flag=True, help='Show debug information and LLM outputs')
-@click.option('--model', type=click.Choice([
-    'gemini', 'gemini-pro', 'gemini-flash', 'gemini-thinking', 
-    'deepseek', 'deepseek-v3', 'deepseek-r1', 'deepseek-r1-zero',
-    'claude', 'claude-3.7-sonnet', 'claude-3.5-sonnet', 'claude-3-opus',
-    'gpt-4', 'gpt-4o', 'gpt-4.1']),
+@click.option('--model', type=click.Choice(MODEL_CHOICES),
     default='deepseek',
     help='LLM model to use for conversation (default: deepseek)')
 def onboard(debug: bool, model: str) -> None:
@@ -52,6 +107,7 @@ def onboard(debug: bool, model: str) -> None:
 @click.option('--log-file', default='request_log.jsonl', help='File to log requests to')
 def server(host: str, port: int, log_level: str, log_requests: bool, log_file: str) -> None:
     """Start the local server for the Zestify Health AI app."""
+    _init_env()
     # Import the server main module
     from backend.services.server.main import start_server
 
@@ -64,95 +120,180 @@ def server(host: str, port: int, log_level: str, log_requests: bool, log_file: s
 @cli.command()
 @click.argument('log_file', type=click.Path(exists=True, readable=True))
 @click.option('--base-url', default='http://localhost:8000', help='Base URL of the server')
-@click.option('--delay', default=0.0, type=float, help='Delay between requests in seconds')
-def replay_requests(log_file: str, base_url: str, delay: float) -> None:
+@click.option('--delay', default=0.0, type=float,
+              help='Delay between requests in seconds (replays serially; prefer --rate)')
+@click.option('--rate', default=None, type=click.FloatRange(min=0, min_open=True),
+              help='Maximum requests started per second; requests may still overlap (ignored when --delay is set)')
+@click.option('--concurrency', default=None, type=click.IntRange(min=1),
+              help='Maximum number of requests in flight (default: 32, or 2 with --batch-size; ignored when --delay is set)')
+@click.option('--batch-size', default=1, type=click.IntRange(min=1),
+              help='Send up to N consecutive POST/PUT requests to the same endpoint as one JSON array '
+                   '(only for endpoints that accept arrays; ignored when --delay is set)')
+@click.option('--workers', default=1, type=click.IntRange(min=1),
+              help='Split the log across N processes, each replaying its share concurrently (ignored when --delay is set)')
+@click.option('--decompression-threads', default=None, type=click.IntRange(min=1),
+              help='Threads used to decompress .gz/.zst logs (requires xopen; default: chosen by xopen)')
+@click.option('--max-line-bytes', default=1 << 20, type=click.IntRange(min=0),
+              help='Reject log lines longer than this many bytes without parsing them (default: 1 MiB, 0 for no limit)')
+@click.option('--output', default=None, type=click.Path(dir_okay=False, writable=True),
+              help='Write one JSON line per replayed request (method, url, status, latency) to this file')
+@click.option('--dry-run', is_flag=True, help='Only parse and validate the log; send no requests')
+@click.option('--dedupe', is_flag=True,
+              help='Send each distinct GET (same path and query parameters) only once; later repeats are skipped')
+@click.option('--verbose-errors', is_flag=True, help='Print every failure as it happens instead of a summary')
+@click.option('--max-error-log', default=20, type=click.IntRange(min=0),
+              help='Number of failures to list in the summary (default: 20)')
+def replay_requests(log_file: str, base_url: str, delay: float, rate: float, concurrency: int, batch_size: int,
+                    workers: int, decompression_threads: int, max_line_bytes: int, output: str,
+                    dry_run: bool, dedupe: bool, verbose_errors: bool, max_error_log: int) -> None:
     """Replay requests from a log file to the server.
 
-    LOG_FILE is the path to the request log file (in JSONL format).
+    LOG_FILE is the path to the request log file (in JSONL format, optionally
+    compressed as .gz, .bz2, .xz or .zst).
     """
-    import json
-    import requests
     import time
-    from datetime import datetime
+    _init_env()
+    from backend.services.replay import (
+        ReplayResult, ReplayStats, ResultWriter, count_lines, dedupe_requests, is_compressed, iter_requests,
+        replay_async, replay_serial, replay_sharded, run,
+    )
 
-    # Load requests from log file
     try:
-        requests_data = []
-        with open(log_file, 'r') as f:
-            for line in f:
-                try:
-                    request_data = json.loads(line.strip())
-                    requests_data.append(request_data)
-                except json.JSONDecodeError:
-                    click.secho(f"Error parsing line: {line}", fg="red")
-                    continue
-    except Exception as e:
+        line_count = count_lines(log_file, decompression_threads)
+    except (OSError, EOFError) as e:
         click.secho(f"Error loading log file: {e}", fg="red")
         return
 
-    if not requests_data:
+    if not line_count:
         click.secho("No requests found in log file", fg="yellow")
         return
 
-    click.secho(f"Loaded {len(requests_data)} requests from {log_file}", fg="green")
-    click.secho(f"Replaying to {base_url}", fg="blue")
+    click.secho(f"Found {line_count} logged lines in {log_file}", fg="green")
+
+    if dry_run:
+        from collections import Counter
+
+        start_time = time.perf_counter_ns()
+        stats = ReplayStats(max_error_log, verbose_errors)
+        endpoints = Counter()
+        requests_data = iter_requests(log_file, stats.record_parse_error, threads=decompression_threads,
+                                      max_line_bytes=max_line_bytes)
+        if dedupe:
+            requests_data = dedupe_requests(requests_data, stats.record_duplicate)
+        for request_data in requests_data:
+            endpoints[(request_data.get('method', 'GET'), request_data.get('path', '/'))] += 1
+        duration = (time.perf_counter_ns() - start_time) / 1e9
+
+        valid_count = sum(endpoints.values())
+        click.secho("\nDry run summary:", fg="blue")
+        click.secho(f"  Valid requests: {valid_count}", fg="green")
+        if dedupe:
+            click.secho(f"  Duplicate GETs skipped: {stats.duplicate_count}", fg="white")
+        click.secho(f"  Unparseable lines: {stats.parse_error_count}",
+                    fg="red" if stats.parse_error_count else "white")
+        click.secho(f"  Parse time: {duration:.2f} seconds", fg="white")
+        if duration > 0:
+            click.secho(f"  Lines/sec: {stats.processed / duration:.1f}", fg="white")
+
+        if endpoints:
+            click.secho("\nMost frequent endpoints:", fg="blue")
+            for (method, path), count in endpoints.most_common(20):
+                click.secho(f"  {count:>8}  {method} {path}", fg="white")
+
+        if stats.error_log:
+            click.secho(f"\nFirst {len(stats.error_log)} of {stats.parse_error_count} failures:", fg="red")
+            for message in stats.error_log:
+                click.secho(f"  {message}", fg="red")
+        return
 
-    # Replay requests
-    start_time = datetime.now()
-    success_count = 0
-    error_count = 0
+    click.secho(f"Replaying to {base_url}", fg="blue")
 
-    with click.progressbar(requests_data, label="Replaying requests") as bar:
-        for i, request_data in enumerate(bar):
-            method = request_data.get('method', 'GET')
-            path = request_data.get('path', '/')
-            query_params = request_data.get('query_params', {})
-            body = request_data.get('body')
+    if workers > 1 and is_compressed(log_file):
+        click.secho("Compressed logs can't be split by byte offset; replaying in a single process", fg="yellow")
+        workers = 1
 
-            # Build the URL
-            url = f"{base_url}{path}"
+    # Large batches already amortize per-request overhead, so keep fewer in flight
+    if concurrency is None:
+        concurrency = 2 if batch_size > 1 else 32
 
-            # Send the request
+    # Replay requests
+    start_time = time.perf_counter_ns()
+    stats = ReplayStats(max_error_log, verbose_errors)
+
+    # Redrawing the bar re-measures the terminal and formats the whole line, so
+    # on large logs only redraw about every 0.1% of progress
+    with click.progressbar(length=line_count, label="Replaying requests",
+                           update_min_steps=max(1, line_count // 1000)) as bar:
+        if workers > 1 and delay <= 0:
+            # Progress advances as each worker finishes its shard
+            replay_sharded(log_file, base_url, workers, concurrency, batch_size, stats,
+                           lambda shard_stats: bar.update(shard_stats.processed), max_line_bytes, rate, output,
+                           dedupe)
+        else:
+            writer = ResultWriter(output) if output else None
+
+            def on_parse_error(line_no: int, error: Exception) -> None:
+                bar.update(1)
+                stats.record_parse_error(line_no, error)
+
+            def on_result(result: ReplayResult) -> None:
+                bar.update(1)
+                stats.record(result)
+                if writer is not None:
+                    writer.write(result)
+
+            def on_duplicate() -> None:
+                bar.update(1)
+                stats.record_duplicate()
+
+            # Requests are parsed lazily while the replay runs
+            requests_data = iter_requests(log_file, on_parse_error, threads=decompression_threads,
+                                          max_line_bytes=max_line_bytes)
+            if dedupe:
+                requests_data = dedupe_requests(requests_data, on_duplicate)
             try:
-                if method == 'GET':
-                    response = requests.get(url, params=query_params)
-                elif method == 'POST':
-                    response = requests.post(url, params=query_params, json=body)
-                elif method == 'PUT':
-                    response = requests.put(url, params=query_params, json=body)
-                elif method == 'DELETE':
-                    response = requests.delete(url, params=query_params)
-                elif method == 'PATCH':
-                    response = requests.patch(url, params=query_params, json=body)
-                else:
-                    click.secho(f"Unsupported method: {method}", fg="red")
-                    error_count += 1
-                    continue
-
-                if 200 <= response.status_code < 300:
-                    success_count += 1
+                if delay > 0:
+                    replay_serial(requests_data, base_url, delay, on_result)
                 else:
-                    error_count += 1
-                    click.secho(f"Error {response.status_code} for {method} {url}: {response.text[:100]}", fg="red")
-            except requests.RequestException as e:
-                error_count += 1
-                click.secho(f"Request error for {method} {url}: {e}", fg="red")
-
-            # Add delay if specified
-            if delay > 0:
-                time.sleep(delay)
+                    run(replay_async(requests_data, base_url, concurrency, on_result, batch_size, rate))
+            finally:
+                if writer is not None:
+                    writer.close()
 
     # Print summary
-    end_time = datetime.now()
-    duration = (end_time - start_time).total_seconds()
+    duration = (time.perf_counter_ns() - start_time) / 1e9
 
     click.secho("\nSummary:", fg="blue")
-    click.secho(f"  Total requests: {len(requests_data)}", fg="white")
-    click.secho(f"  Successful: {success_count}", fg="green")
-    click.secho(f"  Failed: {error_count}", fg="red" if error_count > 0 else "white")
+    click.secho(f"  Total requests: {stats.success_count + stats.error_count}", fg="white")
+    click.secho(f"  Successful: {stats.success_count}", fg="green")
+    click.secho(f"  Failed: {stats.error_count}", fg="red" if stats.error_count > 0 else "white")
+    if stats.parse_error_count:
+        click.secho(f"  Unparseable lines: {stats.parse_error_count}", fg="yellow")
+    if dedupe:
+        click.secho(f"  Duplicate GETs skipped: {stats.duplicate_count}", fg="white")
     click.secho(f"  Duration: {duration:.2f} seconds", fg="white")
-
-from datetime import datetime
+    if output:
+        click.secho(f"  Results written to: {output}", fg="white")
+    if duration > 0:
+        click.secho(f"  Requests/sec: {(stats.success_count + stats.error_count) / duration:.1f}", fg="white")
+
+    latencies = stats.latency_percentiles()
+    if latencies:
+        click.secho("\nLatency:", fg="blue")
+        for percentile, ms in latencies.items():
+            click.secho(f"  p{percentile}: {ms:.2f} ms", fg="white")
+
+    if stats.status_counts:
+        click.secho("\nResponses by status:", fg="blue")
+        for status, count in sorted(stats.status_counts.items(), key=lambda item: (item[0] is None, item[0] or 0)):
+            label = status if status is not None else "no response"
+            ok = status is not None and 200 <= status < 300
+            click.secho(f"  {label}: {count}", fg="green" if ok else "red")
+
+    if stats.error_log:
+        total_failures = stats.error_count + stats.parse_error_count
+        click.secho(f"\nFirst {len(stats.error_log)} of {total_failures} failures:", fg="red")
+        click.secho("\n".join(f"  {message}" for message in stats.error_log), fg="red")
 
 @cli.command()
 @click.argument('user_id')
@@ -160,30 +301,93 @@ from datetime import datetime
 @click.option('--compact', is_flag=True, help='Output a compact version suitable for LLM consumption, removing unnecessary metadata')
 def memory_overview(user_id: str, workout_start_date: str, compact: bool):
     """Load and print a memory overview for the user."""
-    from backend.memory.manager import OverviewMemoryManager
-    import json
+    _init_env()
+    import hashlib
+    from backend.config import CACHE_DIR
+    from backend.memory.manager import OverviewMemoryManager, memory_cache_tag
     try:
-        mm = OverviewMemoryManager(user_id, workout_start_date=workout_start_date)
-
-        if compact:
-            # Get the compact memory representation for LLM consumption
-            memory_data = mm.get_compact_memory()
-            # Convert the Pydantic model to a dictionary
-            memory_dict = memory_data.model_dump()
-        else:
-            # Get the full memory representation
-            memory = mm.load_memory()
-            memory_dict = memory.model_dump()
-
-        def json_serial(obj):
-            if isinstance(obj, datetime):
-                return obj.isoformat()
-            return str(obj)
+        # Workout history is no longer filtered by date when loading (see
+        # OverviewMemoryManager), so --workout-start-date doesn't change the output
+        mm = OverviewMemoryManager(user_id)
 
-        click.secho(json.dumps(memory_dict, indent=2, default=json_serial), fg="cyan")
+        # Loading and rendering a large memory is slow, so the rendered output is
+        # kept on disk and reused for as long as the user's memory files, the package
+        # version and the memory schemas are unchanged
+        cache_file = CACHE_DIR / "overview" / f"{user_id}{'.compact' if compact else ''}.json"
+        fingerprint = hashlib.sha256(
+            f"{memory_cache_tag()}\n{mm.source_fingerprint()!r}".encode()
+        ).hexdigest()
+        output = _read_overview_cache(cache_file, fingerprint)
+
+        if output is None:
+            if compact:
+                # Get the compact memory representation for LLM consumption
+                memory = mm.get_compact_memory()
+            else:
+                # Get the full memory representation
+                memory = mm.load_memory()
+            # Serialize straight from the model in pydantic-core, without building an
+            # intermediate dict or converting datetimes in Python
+            output = memory.model_dump_json(indent=2).encode()
+            _write_overview_cache(cache_file, fingerprint, output)
+
+        # Write the (possibly very large) JSON as raw bytes in one go rather than
+        # styling it line by line
+        click.echo(output)
     except Exception as e:
         click.secho(f"Error: {e}", fg="red")
 
+
+def _read_overview_cache(cache_file: Path, fingerprint: str) -> Optional[bytes]:
+    """Return the cached overview if it was rendered from the same memory files."""
+    try:
+        with open(cache_file, 'rb') as f:
+            if f.readline().rstrip(b'\n') != fingerprint.encode():
+                return None
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_overview_cache(cache_file: Path, fingerprint: str, output: bytes) -> None:
+    """Store a rendered overview together with the fingerprint it was rendered from."""
+    _write_cache_file(cache_file, fingerprint.encode() + b"\n" + output)
+
+
+def _write_cache_file(cache_file: Path, data: bytes) -> None:
+    """Atomically replace a cache file; caching is best-effort."""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_bytes(data)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.debug("Could not write cache file %s: %s", cache_file, e)
+
+def _normalize_response(response: Any) -> Dict[str, Any]:
+    """
+    Reduce a chat response to the dict shape the chat loop displays.
+
+    Chat.chat() returns an LLMResponse, while failed turns (and debug mode)
+    produce plain dicts; normalizing once per turn keeps the display code free
+    of per-field type checks.
+    """
+    if not isinstance(response, dict):
+        prompt_tokens = getattr(response, 'prompt_tokens', None)
+        response = {
+            'message': getattr(response, 'message', None),
+            'options': getattr(response, 'options', None),
+            'memory_updated': getattr(response, 'memory_updated', False),
+            'token_counts': ((prompt_tokens, getattr(response, 'token_count', None))
+                             if prompt_tokens is not None else None),
+        }
+    return {
+        'message': response.get('message') or 'No response available',
+        'options': response.get('options') or [],
+        'memory_updated': bool(response.get('memory_updated')),
+        'token_counts': response.get('token_counts'),
+    }
+
 @cli.command()
 @click.argument('user_id')
 @click.option('--debug', is_flag=True, help='Show debug information including token counts')
@@ -222,20 +426,13 @@ def chat(user_id: str, debug: bool, model: tuple, onboarding: bool) -> None:
     Add the --onboarding flag to switch to onboarding mode, which focuses on gathering
     user information and setting up a fitness profile.
     """
+    _init_env(debug)
     if not os.getenv("OPENROUTER_API_KEY"):
         click.secho("Error: OPENROUTER_API_KEY is not set in your .env file", fg="red")
         click.secho("Create a .env file with OPENROUTER_API_KEY=your_api_key", fg="yellow")
         return
 
     # Parse model input - handle both space-separated string and multiple --model flags
-    valid_models = [
-        'gemini', 'gemini-pro', 'gemini-flash', 'gemini-thinking', 
-        'deepseek', 'deepseek-v3', 'deepseek-r1', 'deepseek-r1-zero',
-        'claude', 'claude-3.7-sonnet', 'claude-3.5-sonnet', 'claude-3-opus',
-        'gpt-4', 'gpt-4o', 'gpt-4.1'
-    ]
-    
-    # Process the model parameter(s)
     models = []
     for m in model:
         # Split by spaces to handle space-separated list in each --model flag
@@ -246,26 +443,18 @@ def chat(user_id: str, debug: bool, model: tuple, onboarding: bool) -> None:
         models = ['deepseek']
     
     # Validate models
-    invalid_models = [m for m in models if m not in valid_models]
+    invalid_models = [m for m in models if m not in VALID_MODELS]
     if invalid_models:
         click.secho(f"Error: Invalid model(s): {', '.join(invalid_models)}", fg="red")
-        click.secho(f"Valid models are: {', '.join(valid_models)}", fg="yellow")
+        click.secho(f"Valid models are: {', '.join(MODEL_CHOICES)}", fg="yellow")
         return
 
-    if debug:
-        # Set root logger to DEBUG for all components
-        logging.getLogger().setLevel(logging.DEBUG)
-        # Make sure our specific loggers are set to DEBUG as well
-        logging.getLogger('backend').setLevel(logging.DEBUG)
-        logger.setLevel(logging.DEBUG)
-        logger.debug("Debug mode enabled - verbose logging activated")
-
-    # Import necessary components
-    from backend.prompts.chat import Chat, Onboarding, ChatRole
+    # Import necessary components (only after the cheap validation above has passed)
+    from backend.prompts.chat import Chat, Onboarding
     from backend.memory.manager import OverviewMemoryManager
-    import json
-    from concurrent.futures import ThreadPoolExecutor
+    from concurrent.futures import ThreadPoolExecutor, as_completed
 
+    executor = None
     try:
         # Initialize memory manager (this will create user dir if needed)
         click.secho(f"Initializing memory manager for user: {user_id}", fg="blue")
@@ -276,29 +465,12 @@ def chat(user_id: str, debug: bool, model: tuple, onboarding: bool) -> None:
         try:
             memory = mm.load_memory()
         except Exception as load_err: # Catch broader errors during loading/validation
-            logger.error(f"Critical error loading memory: {load_err}", exc_info=True)
+            logger.error("Critical error loading memory: %s", load_err, exc_info=True)
             click.secho(f"Critical error loading memory: {load_err}. Exiting.", fg="red")
             return # Exit if loading fundamentally failed
 
         # Initialize one chat instance for each model
         chat_instances = {}
-        model_colors = {
-            'deepseek': 'blue',
-            'deepseek-v3': 'blue',
-            'deepseek-r1': 'cyan',
-            'deepseek-r1-zero': 'cyan',
-            'claude': 'magenta',
-            'claude-3.7-sonnet': 'magenta',
-            'claude-3.5-sonnet': 'bright_magenta',
-            'claude-3-opus': 'bright_magenta',
-            'gemini': 'green',
-            'gemini-pro': 'bright_green',
-            'gemini-flash': 'green',
-            'gemini-thinking': 'bright_green',
-            'gpt-4': 'yellow',
-            'gpt-4o': 'bright_yellow',
-            'gpt-4.1': 'yellow'
-        }
         
         if onboarding:
             # Check if user profile exists, essential for onboarding
@@ -323,9 +495,9 @@ def chat(user_id: str, debug: bool, model: tuple, onboarding: bool) -> None:
             if memory.user_profile.name:
                  initial_prompt = f"Start onboarding for {memory.user_profile.name}"
 
-            initial_response = chat_instances[models[0]].chat(initial_prompt)
-            click.secho(f"Coach: {initial_response.get('message', 'No response')}", fg="cyan")
-            if 'options' in initial_response and initial_response['options']:
+            initial_response = _normalize_response(chat_instances[models[0]].chat(initial_prompt))
+            click.secho(f"Coach: {initial_response['message']}", fg="cyan")
+            if initial_response['options']:
                  click.secho("\nOptions:", fg="yellow")
                  for i, option in enumerate(initial_response['options']):
                       click.secho(f"{i+1}. {option}", fg="yellow")
@@ -344,20 +516,26 @@ def chat(user_id: str, debug: bool, model: tuple, onboarding: bool) -> None:
             
             click.secho("Type 'tokens' to see token counts for the last exchange.", fg="green")
 
-        logger.info(f"Starting chat in {mode_name} with models: {', '.join(models)}")
+        logger.info("Starting chat in %s with models: %s", mode_name, ', '.join(models))
         last_token_info = {}
 
+        # One pool for the whole session, so each turn doesn't spawn and join new
+        # threads; a single model is called directly without a thread hop
+        if len(chat_instances) > 1:
+            executor = ThreadPoolExecutor(max_workers=len(chat_instances), thread_name_prefix="llm")
+
         # Main chat loop
         while True:
             user_input = click.prompt("\nYou", prompt_suffix="> ", type=str)
-            if user_input.lower() in ["exit", "quit", "q"]:
+            command = user_input.lower()
+            if command in EXIT_COMMANDS:
                 break
                 
-            if user_input.lower() == "tokens" and last_token_info:
+            if command == "tokens" and last_token_info:
                 click.secho("\nToken usage for last exchange:", fg="blue")
                 for m, (prompt_tokens, completion_tokens) in last_token_info.items():
                     total_tokens = prompt_tokens + (completion_tokens or 0)
-                    click.secho(f"  {m}:", fg=model_colors.get(m, 'white'))
+                    click.secho(f"  {m}:", fg=MODEL_COLORS.get(m, 'white'))
                     click.secho(f"    Prompt tokens: {prompt_tokens}", fg="white")
                     click.secho(f"    Completion tokens: {completion_tokens or 'unknown'}", fg="white")
                     click.secho(f"    Total tokens: {total_tokens}", fg="white")
@@ -370,80 +548,53 @@ def chat(user_id: str, debug: bool, model: tuple, onboarding: bool) -> None:
                 try:
                     return model_name, chat_instances[model_name].chat(user_input)
                 except Exception as e:
-                    logger.error(f"Error from {model_name}: {str(e)}")
+                    logger.error("Error from %s: %s", model_name, e)
                     return model_name, {"message": f"Error: {str(e)}", "error": True}
             
-            with ThreadPoolExecutor(max_workers=len(chat_instances)) as executor:
-                future_responses = [executor.submit(get_response, m) for m in chat_instances]
-                for future in future_responses:
-                    model_name, response = future.result()
-                    responses[model_name] = response
-                    
-                    # Store token counts for later display
-                    if hasattr(response, 'token_counts'):
-                        last_token_info[model_name] = response.token_counts
-                    elif isinstance(response, dict) and 'token_counts' in response:
-                        last_token_info[model_name] = response['token_counts']
-            
-            # Display responses
-            if len(responses) == 1:
+            if executor is None:
+                model_name, response = get_response(models[0])
+                response = _normalize_response(response)
+                responses[model_name] = response
+                if response['token_counts']:
+                    last_token_info[model_name] = response['token_counts']
+
                 # Single model mode - simple display
-                model_name = list(responses.keys())[0]
-                response = responses[model_name]
-                
-                # Extract message
-                if hasattr(response, 'message'):
-                    message = response.message
-                else:
-                    message = response.get('message', 'No response available')
-                
-                # Display the message
-                click.secho(f"\nCoach ({model_name}): ", fg=model_colors.get(model_name, 'cyan'), nl=False)
-                click.secho(f"{message}", fg="white")
-                
+                click.secho(f"\nCoach ({model_name}): ", fg=MODEL_COLORS.get(model_name, 'cyan'), nl=False)
+                click.secho(f"{response['message']}", fg="white")
+
                 # Handle options for onboarding if present
-                if onboarding:
-                    # Check if response has options attribute or key
-                    options = None
-                    if hasattr(response, 'options'):
-                        options = response.options
-                    elif isinstance(response, dict) and 'options' in response:
-                        options = response['options']
-
-                    if options:
-                        click.secho("\nOptions:", fg="yellow")
-                        for i, option in enumerate(options):
-                            click.secho(f"{i+1}. {option}", fg="yellow")
+                if onboarding and response['options']:
+                    click.secho("\nOptions:", fg="yellow")
+                    for i, option in enumerate(response['options']):
+                        click.secho(f"{i+1}. {option}", fg="yellow")
 
                 # Show memory update notification if applicable
-                memory_updated = False
-                if hasattr(response, 'memory_updated'):
-                    memory_updated = response.memory_updated
-                elif isinstance(response, dict):
-                    memory_updated = response.get('memory_updated', False)
-
-                if onboarding and memory_updated:
+                if onboarding and response['memory_updated']:
                     click.secho("\n[Your profile has been updated]", fg="green")
-            
+
             else:
-                # Multi-model mode - display responses side by side with dividers
+                # Multi-model mode - display responses with dividers, each one as
+                # soon as its model answers rather than waiting for the slowest
                 click.secho("\n" + "="*80, fg="white")
                 click.secho("MODEL RESPONSES:", fg="bright_white", bold=True)
                 click.secho("="*80, fg="white")
-                
-                for model_name, response in responses.items():
-                    # Extract message
-                    if hasattr(response, 'message'):
-                        message = response.message
-                    else:
-                        message = response.get('message', 'No response available')
-                    
+
+                futures = [executor.submit(get_response, m) for m in chat_instances]
+                for future in as_completed(futures):
+                    model_name, response = future.result()
+                    response = _normalize_response(response)
+                    responses[model_name] = response
+
+                    # Store token counts for later display
+                    if response['token_counts']:
+                        last_token_info[model_name] = response['token_counts']
+
                     # Display the model name and response
-                    click.secho(f"\n[{model_name}]", fg=model_colors.get(model_name, 'cyan'), bold=True)
+                    click.secho(f"\n[{model_name}]", fg=MODEL_COLORS.get(model_name, 'cyan'), bold=True)
                     click.secho("-"*80, fg="white")
-                    click.secho(f"{message}", fg="white")
+                    click.secho(f"{response['message']}", fg="white")
                     click.secho("-"*80, fg="white")
-            
+
         # Onboarding summary display if applicable
         if onboarding:
             click.secho("\n=== Your Fitness Profile Summary ===", fg="green", bold=True)
@@ -457,35 +608,67 @@ def chat(user_id: str, debug: bool, model: tuple, onboarding: bool) -> None:
         click.secho("\nMemory has been saved automatically.", fg="green")
 
     except Exception as e:
-        logger.error(f"Error in chat session: {str(e)}", exc_info=True)
+        logger.error("Error in chat session: %s", e, exc_info=True)
         click.secho(f"Error: {str(e)}", fg="red")
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
 
 @cli.command()
 @click.option('--verbose', is_flag=True, help='Show detailed model information')
-def list_models(verbose: bool):
+@click.option('--refresh', is_flag=True, help='Fetch the model list from OpenRouter even if a cached copy is recent')
+def list_models(verbose: bool, refresh: bool):
     """List available models from OpenRouter and test connection."""
-    from backend.llm.openrouter_client import OpenRouterClient, MODELS
+    _init_env()
     import json
+    import time
+    from backend.config import CACHE_DIR
+    from backend.llm.openrouter_client import OpenRouterClient, MODELS
 
     # First check our local model mapping
     click.secho("Local model mappings:", fg="blue")
     for model_key, model_id in MODELS.items():
         click.secho(f"  {model_key} -> {model_id}", fg="cyan")
 
-    if not os.getenv("OPENROUTER_API_KEY"):
-        click.secho("\nError: OPENROUTER_API_KEY is not set in your .env file", fg="red")
-        click.secho("Create a .env file with OPENROUTER_API_KEY=your_api_key", fg="yellow")
-        return
-
-    click.secho("\nConnecting to OpenRouter API to fetch available models...", fg="blue")
-
+    # The OpenRouter catalogue changes rarely, so a recent copy is reused
+    cache_file = CACHE_DIR / "openrouter_models.json"
+    models = None
+    cached = None
     try:
-        client = OpenRouterClient()
-        models = client.list_models()
+        age = time.time() - cache_file.stat().st_mtime
+        cached = json.loads(cache_file.read_bytes())
+        if not refresh and age < MODELS_CACHE_TTL:
+            models = cached
+            click.secho(f"\nUsing model list cached {age / 60:.0f} min ago (--refresh to fetch again)", fg="blue")
+    except (OSError, ValueError):
+        cached = None
 
-        if "error" in models:
-            click.secho(f"Error connecting to OpenRouter: {models['error']}", fg="red")
-            return
+    try:
+        if models is None:
+            if not os.getenv("OPENROUTER_API_KEY"):
+                click.secho("\nError: OPENROUTER_API_KEY is not set in your .env file", fg="red")
+                click.secho("Create a .env file with OPENROUTER_API_KEY=your_api_key", fg="yellow")
+                return
+
+            click.secho("\nConnecting to OpenRouter API to fetch available models...", fg="blue")
+            client = OpenRouterClient()
+            # An expired copy is revalidated rather than downloaded again when
+            # the server supports ETags
+            models = client.list_models(etag=cached.get('etag') if cached else None)
+
+            if "error" in models:
+                click.secho(f"Error connecting to OpenRouter: {models['error']}", fg="red")
+                return
+
+            if models.get('not_modified'):
+                models = cached
+                try:
+                    # Restart the TTL for the revalidated copy
+                    os.utime(cache_file)
+                except OSError:
+                    pass
+            elif models.get('data'):
+                _write_cache_file(cache_file, json.dumps(models).encode())
 
         if not models.get('data'):
             click.secho("No models found or unexpected response format", fg="yellow")
@@ -495,33 +678,36 @@ def list_models(verbose: bool):
 
         click.secho(f"\nFound {len(models['data'])} available models:", fg="green")
 
+        app_model_ids = frozenset(MODELS.values())
+        # The catalogue runs to hundreds of rows: style them into one buffer and
+        # write it once instead of issuing a styled write per line
+        lines = []
         for model in models['data']:
             model_id = model.get('id', 'unknown')
             model_name = model.get('name', 'Unnamed')
 
-            in_our_models = False
-            for key, value in MODELS.items():
-                if value == model_id:
-                    in_our_models = True
-                    break
+            in_our_models = model_id in app_model_ids
 
             color = "green" if in_our_models else "white"
             status = " (in app)" if in_our_models else ""
-            click.secho(f"  {model_id}: {model_name}{status}", fg=color)
+            lines.append(click.style(f"  {model_id}: {model_name}{status}", fg=color))
 
             if verbose:
                 context_length = model.get('context_length', 'unknown')
                 pricing = model.get('pricing', {})
-                click.secho(f"    Context length: {context_length} tokens", fg="cyan")
+                lines.append(click.style(f"    Context length: {context_length} tokens", fg="cyan"))
                 if pricing:
                     input_price = pricing.get('input', 0)
                     output_price = pricing.get('output', 0)
-                    click.secho(f"    Pricing: ${input_price}/M input tokens, ${output_price}/M output tokens", fg="cyan")
+                    lines.append(click.style(
+                        f"    Pricing: ${input_price}/M input tokens, ${output_price}/M output tokens", fg="cyan"))
+        click.echo("\n".join(lines))
 
     except Exception as e:
         click.secho(f"Error: {e}", fg="red")
-        import traceback
-        click.secho(traceback.format_exc(), fg="red")
+        if verbose:
+            import traceback
+            click.secho(traceback.format_exc(), fg="red")
 
 def main():
     """Main entry point for the CLI."""
@@ -530,7 +716,8 @@ def main():
     except Exception as e:
         click.secho(f"Error: {str(e)}", fg="red")
         # Use --debug for more detailed error information
-        logger.error(f"CLI error: {str(e)}", exc_info=True)
+        _init_env()
+        logger.error("CLI error: %s", e, exc_info=True)
 
 if __name__ == "__main__":
     main()
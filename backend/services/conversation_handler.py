@@ -1,6 +1,6 @@
 from backend.llm.openrouter_client import OpenRouterClient, MODELS
 from typing import List, Dict, Any, Optional
-import json
+import asyncio
 
 class ConversationHandler:
     def __init__(self, user_id: str, debug: bool = False, model: str = 'gemini') -> None:
@@ -53,25 +53,16 @@ class ConversationHandler:
         self.add_message_to_history("user", message)
         
         try:
-            # Get response from the model
-            response = await self.client.chat_completion(
+            # The client is synchronous; run it off the event loop. It returns the
+            # already-parsed JSON body, so there is nothing left to decode here
+            response = await asyncio.to_thread(
+                self.client.chat_completion,
                 messages=self.conversation_history
             )
             
             if self.debug:
                 print(f"Debug - Raw response: {response}")
             
-            # If response is a string, try to parse it as JSON
-            if isinstance(response, str):
-                try:
-                    response = json.loads(response.strip())
-                except json.JSONDecodeError as e:
-                    if self.debug:
-                        print(f"Debug - Failed to parse JSON: {e}")
-                    # If JSON parsing fails, return the string as is
-                    self.add_message_to_history("assistant", response)
-                    return response
-            
             # Handle dictionary response
             if isinstance(response, dict):
                 if 'choices' in response and len(response['choices']) > 0:
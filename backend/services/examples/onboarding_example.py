@@ -8,11 +8,11 @@ This demonstrates how to:
 4. Update memories
 """
 
-import os
 import json
 import yaml
 import datetime
 import subprocess
+from functools import lru_cache
 from pathlib import Path
 
 # Set up paths
@@ -24,38 +24,56 @@ if not MEMORY_TEMPLATES_DIR.exists():
     MEMORY_TEMPLATES_DIR = REPO_ROOT / "services" / "memory_templates"
 MEMORY_UTILS_PATH = REPO_ROOT / "memory" / "memory_utils.jsonnet"
 
-# Ensure jsonnet is installed
+# Prefer the in-process jsonnet binding (pip install jsonnet), which avoids
+# starting a jsonnet process for every evaluation; fall back to the binary
 try:
-    subprocess.run(["jsonnet", "--version"], check=True, capture_output=True)
-except (subprocess.CalledProcessError, FileNotFoundError):
-    print("Error: jsonnet is not installed or not in PATH.")
-    print("Please install jsonnet: https://jsonnet.org/")
-    exit(1)
+    import _jsonnet
+except ImportError:
+    _jsonnet = None
+    try:
+        subprocess.run(["jsonnet", "--version"], check=True, capture_output=True)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        print("Error: jsonnet is not installed or not in PATH.")
+        print("Please install jsonnet: https://jsonnet.org/ (or pip install jsonnet)")
+        exit(1)
 
 def get_timestamp():
     """Get current timestamp in ISO format."""
     return datetime.datetime.now().isoformat()
 
-def run_jsonnet(jsonnet_file, ext_vars=None):
-    """Run jsonnet and return the result as a Python object."""
+@lru_cache(maxsize=None)
+def _read_import(path):
+    """Read a jsonnet library file once per run."""
+    return Path(path).read_bytes()
+
+def _import_callback(base_dir, rel_path):
+    """Serve jsonnet imports from memory after the first read of each file."""
+    path = str(Path(base_dir) / rel_path)
+    return path, _read_import(path)
+
+def run_jsonnet(code, ext_vars=None):
+    """Evaluate a jsonnet snippet and return the result as a Python object."""
     if ext_vars is None:
         ext_vars = {}
 
     # Always include timestamp
     if 'timestamp' not in ext_vars:
         ext_vars['timestamp'] = get_timestamp()
-
-    # Build command
-    cmd = ["jsonnet"]
-    for key, value in ext_vars.items():
-        cmd.extend(["--ext-str", f"{key}={value}"])
-    cmd.append(str(jsonnet_file))
-
-    # Run jsonnet
-    result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    ext_vars = {key: str(value) for key, value in ext_vars.items()}
+
+    if _jsonnet is not None:
+        output = _jsonnet.evaluate_snippet("snippet", code, ext_vars=ext_vars,
+                                           import_callback=_import_callback)
+    else:
+        # Build command; the snippet is passed on stdin
+        cmd = ["jsonnet"]
+        for key, value in ext_vars.items():
+            cmd.extend(["--ext-str", f"{key}={value}"])
+        cmd.append("-")
+        output = subprocess.run(cmd, input=code, check=True, capture_output=True, text=True).stdout
 
     # Parse JSON output
-    return json.loads(result.stdout)
+    return json.loads(output)
 
 def jsonnet_to_yaml(jsonnet_obj):
     """Convert jsonnet output to YAML string."""
@@ -81,13 +99,8 @@ def main():
     utils.composeMemory('{user_id}')
     """
 
-    # Save this to a temporary file
-    temp_file = REPO_ROOT / "services" / "examples" / "temp_memory.jsonnet"
-    with open(temp_file, 'w') as f:
-        f.write(memory_utils_code)
-
     # Run jsonnet to get the initial memory
-    memory = run_jsonnet(temp_file)
+    memory = run_jsonnet(memory_utils_code)
 
     # Convert to YAML for inspection
     memory_yaml = jsonnet_to_yaml(memory)
@@ -106,12 +119,8 @@ def main():
     }})
     """
 
-    # Save this to a temporary file
-    with open(temp_file, 'w') as f:
-        f.write(prompt_code)
-
     # Run jsonnet to get the prompt
-    prompt = run_jsonnet(temp_file)
+    prompt = run_jsonnet(prompt_code)
 
     # Simulate LLM call
     llm_response = simulate_llm_call(prompt)
@@ -139,12 +148,8 @@ def main():
     )
     """
 
-    # Save this to a temporary file
-    with open(temp_file, 'w') as f:
-        f.write(goal_code)
-
     # Run jsonnet to get the goal
-    goal = run_jsonnet(temp_file)
+    goal = run_jsonnet(goal_code)
 
     # Update the memory with the new goal
     update_code = f"""
@@ -185,12 +190,8 @@ def main():
     }}
     """
 
-    # Save this to a temporary file
-    with open(temp_file, 'w') as f:
-        f.write(update_code)
-
     # Run jsonnet to get the updated memory
-    updated_memory = run_jsonnet(temp_file)
+    updated_memory = run_jsonnet(update_code)
 
     # Convert to YAML for LLM
     yaml_code = f"""
@@ -199,12 +200,8 @@ def main():
     utils.toYaml(memory)
     """
 
-    # Save this to a temporary file
-    with open(temp_file, 'w') as f:
-        f.write(yaml_code)
-
     # Run jsonnet to get the YAML
-    yaml_obj = run_jsonnet(temp_file)
+    yaml_obj = run_jsonnet(yaml_code)
     yaml_str = jsonnet_to_yaml(yaml_obj)
 
     print("\n=== UPDATED MEMORY (YAML for LLM) ===")
@@ -220,20 +217,13 @@ def main():
     }})
     """
 
-    # Save this to a temporary file
-    with open(temp_file, 'w') as f:
-        f.write(prompt_code)
-
     # Run jsonnet to get the prompt
-    prompt = run_jsonnet(temp_file)
+    prompt = run_jsonnet(prompt_code)
 
     # Simulate LLM call for next question
     llm_response = simulate_llm_call(prompt)
     print(f"\nLLM: {llm_response}")
 
-    # Clean up temporary file
-    os.remove(temp_file)
-
     print("\n=== END ONBOARDING FLOW ===")
     print(f"Memory system demonstration complete for user {user_id}")
 
@@ -12,12 +12,18 @@ This script extracts:
 The extracted data is saved to an example_user directory.
 """
 
-import json
 import os
 import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 import shutil
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set
+
+try:
+    import orjson as _json
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    import json as _json
 
 # Configuration
 DAYS_TO_EXTRACT = 30  # Extract data from the last 30 days
@@ -43,15 +49,19 @@ def is_within_days(date_str: str, days: int) -> bool:
     if not date_str:
         return False
 
-    date = parse_date(date_str)
-    delta = CURRENT_DATE - date
-    return delta.days <= days
+    return parse_date(date_str) > _cutoff_date(days)
+
+@lru_cache(maxsize=None)
+def _cutoff_date(days: int) -> datetime.datetime:
+    """Return the latest date that is more than `days` whole days before now."""
+    # (CURRENT_DATE - date).days <= days  <=>  date > CURRENT_DATE - (days + 1)
+    return CURRENT_DATE - datetime.timedelta(days=days + 1)
 
 def extract_workouts() -> Dict[str, Any]:
     """Extract workout data from the last DAYS_TO_EXTRACT days."""
     try:
-        with open(os.path.join(SOURCE_DIR, "workout_history.json"), "r") as f:
-            workout_data = json.load(f)
+        with open(os.path.join(SOURCE_DIR, "workout_history.json"), "rb") as f:
+            workout_data = _json.loads(f.read())
 
         # Filter workouts by date
         recent_workouts = []
@@ -71,11 +81,11 @@ def extract_workouts() -> Dict[str, Any]:
         print(f"Error extracting workout data: {e}")
         return {"workouts": [], "userId": "example_user", "lastSyncTime": CURRENT_DATE.isoformat()}
 
-def extract_heart_rate_data(workout_ids: List[str]) -> List[Dict[str, Any]]:
+def extract_heart_rate_data(workout_ids: Set[str]) -> List[Dict[str, Any]]:
     """Extract heart rate data related to the specified workouts."""
     try:
-        with open(os.path.join(SOURCE_DIR, "heart_rate_data.json"), "r") as f:
-            heart_rate_data = json.load(f)
+        with open(os.path.join(SOURCE_DIR, "heart_rate_data.json"), "rb") as f:
+            heart_rate_data = _json.loads(f.read())
 
         # Filter heart rate data by workout IDs and date
         filtered_data = []
@@ -89,15 +99,15 @@ def extract_heart_rate_data(workout_ids: List[str]) -> List[Dict[str, Any]]:
         print(f"Error extracting heart rate data: {e}")
         return []
 
-def extract_route_data(workout_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+def extract_route_data(workout_ids: Set[str]) -> Dict[str, List[Dict[str, Any]]]:
     """Extract route data for the specified workouts."""
     route_data = {}
 
     for workout_id in workout_ids:
         route_file = f"raw_route_{workout_id}.json"
         try:
-            with open(os.path.join(SOURCE_DIR, route_file), "r") as f:
-                route = json.load(f)
+            with open(os.path.join(SOURCE_DIR, route_file), "rb") as f:
+                route = _json.loads(f.read())
                 route_data[workout_id] = route
         except FileNotFoundError:
             # Route data might not exist for all workouts
@@ -110,8 +120,8 @@ def extract_route_data(workout_ids: List[str]) -> Dict[str, List[Dict[str, Any]]
 def extract_weight_data() -> List[Dict[str, Any]]:
     """Extract weight data for a longer period."""
     try:
-        with open(os.path.join(SOURCE_DIR, "weight_data.json"), "r") as f:
-            weight_data = json.load(f)
+        with open(os.path.join(SOURCE_DIR, "weight_data.json"), "rb") as f:
+            weight_data = _json.loads(f.read())
 
         # Weight data is typically small, so we can include more history
         return weight_data
@@ -133,8 +143,8 @@ def extract_sleep_data() -> Dict[str, List[Dict[str, Any]]]:
 
     for category in sleep_categories:
         try:
-            with open(os.path.join(SOURCE_DIR, category), "r") as f:
-                data = json.load(f)
+            with open(os.path.join(SOURCE_DIR, category), "rb") as f:
+                data = _json.loads(f.read())
 
             # Filter by date
             filtered_data = []
@@ -165,8 +175,8 @@ def extract_additional_metrics() -> Dict[str, List[Dict[str, Any]]]:
 
     for metric in metrics:
         try:
-            with open(os.path.join(SOURCE_DIR, metric), "r") as f:
-                data = json.load(f)
+            with open(os.path.join(SOURCE_DIR, metric), "rb") as f:
+                data = _json.loads(f.read())
 
             # Filter by date
             filtered_data = []
@@ -188,30 +198,30 @@ def extract_additional_metrics() -> Dict[str, List[Dict[str, Any]]]:
 def combine_workout_data(workouts: Dict[str, Any], heart_rate: List[Dict[str, Any]],
                          routes: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
     """Combine workout data with related heart rate and route data."""
-    workout_ids = [workout.get("id") for workout in workouts.get("workouts", [])]
-
-    # Create a mapping of workout IDs to heart rate data
+    # Attach an empty heart rate list and the route data to each workout,
+    # keyed by workout ID so heart rate entries can be added in one pass
     workout_heart_rates = {}
-    for entry in heart_rate:
-        workout_id = entry.get("sourceId")
-        if workout_id in workout_ids:
-            if workout_id not in workout_heart_rates:
-                workout_heart_rates[workout_id] = []
-            workout_heart_rates[workout_id].append(entry)
-
-    # Add heart rate and route data to each workout
     for workout in workouts.get("workouts", []):
         workout_id = workout.get("id")
-        workout["heartRateData"] = workout_heart_rates.get(workout_id, [])
+        workout["heartRateData"] = workout_heart_rates.setdefault(workout_id, [])
         workout["routeData"] = routes.get(workout_id, [])
 
+    for entry in heart_rate:
+        entries = workout_heart_rates.get(entry.get("sourceId"))
+        if entries is not None:
+            entries.append(entry)
+
     return workouts
 
 def save_data(data: Any, filename: str):
     """Save data to a JSON file in the target directory."""
     filepath = os.path.join(TARGET_DIR, filename)
-    with open(filepath, "w") as f:
-        json.dump(data, f, indent=2)
+    if hasattr(_json, "OPT_INDENT_2"):
+        output = _json.dumps(data, option=_json.OPT_INDENT_2)
+    else:
+        output = _json.dumps(data, indent=2, ensure_ascii=False).encode()
+    with open(filepath, "wb") as f:
+        f.write(output)
     print(f"Saved {filename}")
 
 def main():
@@ -219,16 +229,27 @@ def main():
     print("Extracting health data...")
     ensure_target_dir()
 
-    # Extract workout data
-    workouts = extract_workouts()
-    workout_ids = [workout.get("id") for workout in workouts.get("workouts", [])]
-
-    # Extract related data
-    heart_rate_data = extract_heart_rate_data(workout_ids)
-    route_data = extract_route_data(workout_ids)
-    weight_data = extract_weight_data()
-    sleep_data = extract_sleep_data()
-    additional_metrics = extract_additional_metrics()
+    # The extractions read separate files, so run them in a thread pool to
+    # overlap their file reads. Only the heart rate and route data depend on
+    # the workouts.
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        weight_future = executor.submit(extract_weight_data)
+        sleep_future = executor.submit(extract_sleep_data)
+        metrics_future = executor.submit(extract_additional_metrics)
+
+        # Extract workout data
+        workouts = extract_workouts()
+        workout_ids = {workout.get("id") for workout in workouts.get("workouts", [])}
+
+        # Extract related data
+        heart_rate_future = executor.submit(extract_heart_rate_data, workout_ids)
+        route_future = executor.submit(extract_route_data, workout_ids)
+
+        heart_rate_data = heart_rate_future.result()
+        route_data = route_future.result()
+        weight_data = weight_future.result()
+        sleep_data = sleep_future.result()
+        additional_metrics = metrics_future.result()
 
     # Combine workout data with heart rate and route data
     combined_workouts = combine_workout_data(workouts, heart_rate_data, route_data)
@@ -0,0 +1,260 @@
+# test_replay.py
+import json
+
+from backend.services.replay import (
+    _batch_request,
+    _url_for,
+    dedupe_requests,
+    group_batches,
+    ReplayStats,
+    iter_requests,
+    replay_async,
+    replay_serial,
+    replay_sharded,
+    run,
+    shard_log,
+)
+
+BASE_URL = "http://localhost:8000"
+
+
+def post(path, body=None, method="POST", query=None):
+    return {"method": method, "path": path, "query_params": query or {}, "body": body}
+
+
+def workout(user_id, workout_id):
+    return post("/workouts", {"user_id": user_id, "workout": {"id": workout_id}})
+
+
+def paths(batches):
+    return [[(r["method"], r["path"]) for r in batch] for batch in batches]
+
+
+def test_group_batches_splits_on_method_and_path_changes():
+    requests_data = [
+        post("/a", {"n": 1}),
+        post("/a", {"n": 2}),
+        post("/a", {"n": 3}, method="PUT"),
+        post("/b", {"n": 4}, method="PUT"),
+        post("/b", {"n": 5}, method="PUT"),
+    ]
+    assert paths(group_batches(requests_data, 10)) == [
+        [("POST", "/a"), ("POST", "/a")],
+        [("PUT", "/a")],
+        [("PUT", "/b"), ("PUT", "/b")],
+    ]
+
+
+def test_group_batches_splits_on_query_and_user_id_changes():
+    requests_data = [
+        post("/a", query={"x": "1"}),
+        post("/a", query={"x": "2"}),
+        workout("u1", 1),
+        workout("u1", 2),
+        workout("u2", 3),
+    ]
+    assert [len(batch) for batch in group_batches(requests_data, 10)] == [1, 1, 2, 1]
+
+
+def test_group_batches_never_batches_other_methods():
+    requests_data = [post("/a"), post("/a", method="GET"), post("/a", method="GET"),
+                     post("/a", method="DELETE"), post("/a")]
+    assert [len(batch) for batch in group_batches(requests_data, 10)] == [1, 1, 1, 1, 1]
+
+
+def test_group_batches_size_boundary():
+    requests_data = [post("/a", {"n": n}) for n in range(7)]
+    assert [len(batch) for batch in group_batches(requests_data, 3)] == [3, 3, 1]
+    assert [len(batch) for batch in group_batches(requests_data, 7)] == [7]
+    assert [len(batch) for batch in group_batches(requests_data, 1)] == [1] * 7
+
+
+def test_group_batches_after_dedupe():
+    requests_data = [
+        workout("u1", 1),
+        post("/status", method="GET"),
+        workout("u1", 2),
+        post("/status", method="GET"),
+        workout("u1", 3),
+    ]
+    duplicates = []
+    batches = list(group_batches(dedupe_requests(requests_data, lambda: duplicates.append(1)), 10))
+    # The first GET is sent and splits the uploads; the skipped repeat doesn't
+    assert paths(batches) == [
+        [("POST", "/workouts")],
+        [("GET", "/status")],
+        [("POST", "/workouts"), ("POST", "/workouts")],
+    ]
+    assert len(duplicates) == 1
+
+
+def test_batch_request_rewrites_workout_uploads():
+    batch = [workout("u1", 1), workout("u1", 2)]
+    url, kwargs = _batch_request(BASE_URL, "POST", batch)
+    assert url == BASE_URL + "/workouts/batch"
+    assert json.loads(kwargs["data"]) == {"user_id": "u1", "workouts": [{"id": 1}, {"id": 2}]}
+
+
+def test_batch_request_sends_other_batches_as_arrays():
+    url, kwargs = _batch_request(BASE_URL, "POST", [post("/a", {"n": 1}), post("/a", {"n": 2})])
+    assert url == BASE_URL + "/a"
+    assert json.loads(kwargs["data"]) == [{"n": 1}, {"n": 2}]
+
+    # Only POSTs have a batch route; PUTs to the same path stay an array
+    url, kwargs = _batch_request(BASE_URL, "PUT", [workout("u1", 1), workout("u1", 2)])
+    assert url == BASE_URL + "/workouts"
+    assert [item["workout"] for item in json.loads(kwargs["data"])] == [{"id": 1}, {"id": 2}]
+
+
+def test_batch_request_single_workout_is_not_rewritten():
+    url, kwargs = _batch_request(BASE_URL, "POST", [workout("u1", 1)])
+    assert url == BASE_URL + "/workouts"
+    assert json.loads(kwargs["data"]) == {"user_id": "u1", "workout": {"id": 1}}
+
+
+def write_log(tmp_path, lines, trailing_newline=True):
+    log_file = tmp_path / "requests.jsonl"
+    data = "\n".join(lines) + ("\n" if trailing_newline else "")
+    log_file.write_bytes(data.encode())
+    return str(log_file)
+
+
+def sample_lines(count):
+    """Log lines of uneven length, with blank and unparseable lines mixed in."""
+    lines = []
+    for line_no in range(1, count + 1):
+        if line_no % 7 == 0:
+            lines.append("")
+        elif line_no % 5 == 0:
+            lines.append("not json")
+        else:
+            lines.append(json.dumps({"method": "GET", "path": "/x" * (line_no % 13), "line": line_no}))
+    return lines
+
+
+def read_shards(log_file, shards):
+    seen, errors = [], []
+    for shard in shards:
+        for request_data in iter_requests(log_file, lambda line_no, e: errors.append(line_no), shard):
+            seen.append(request_data["line"])
+    return seen, errors
+
+
+def test_shards_cover_every_line_once(tmp_path):
+    lines = sample_lines(50)
+    expected = [n for n, line in enumerate(lines, 1) if line.startswith("{")]
+    expected_errors = [n for n, line in enumerate(lines, 1) if line == "not json"]
+    for trailing_newline in (True, False):
+        log_file = write_log(tmp_path, lines, trailing_newline)
+        for workers in (1, 2, 3, 7, 16, 50):
+            shards = shard_log(log_file, workers)
+            # Shards are contiguous, non-empty and span the whole file
+            assert shards[0].start == 0
+            assert shards[-1].end == len(open(log_file, "rb").read())
+            assert all(a.end == b.start for a, b in zip(shards, shards[1:]))
+            assert all(shard.end > shard.start for shard in shards)
+            seen, errors = read_shards(log_file, shards)
+            assert sorted(seen) == expected
+            # Line numbers reported from any shard match the file
+            assert sorted(errors) == expected_errors
+
+
+def test_shard_first_line_matches_file(tmp_path):
+    lines = sample_lines(30)
+    log_file = write_log(tmp_path, lines)
+    with open(log_file, "rb") as f:
+        data = f.read()
+    for shard in shard_log(log_file, 6):
+        # Every shard starts at the beginning of the line it is numbered from
+        assert shard.start == 0 or data[shard.start - 1:shard.start] == b"\n"
+        assert data[:shard.start].count(b"\n") + 1 == shard.first_line
+
+
+def test_more_shards_than_lines(tmp_path):
+    log_file = write_log(tmp_path, sample_lines(3))
+    shards = shard_log(log_file, 10)
+    assert 1 <= len(shards) <= 3
+    seen, errors = read_shards(log_file, shards)
+    assert seen == [1, 2, 3]
+    assert errors == []
+
+
+def test_empty_log(tmp_path):
+    log_file = tmp_path / "empty.jsonl"
+    log_file.write_bytes(b"")
+    assert shard_log(str(log_file), 4) == []
+
+    output = tmp_path / "results.jsonl"
+    stats = ReplayStats()
+    replay_sharded(str(log_file), "http://localhost:1", 4, 8, 1, stats, lambda shard_stats: None,
+                   rate=10.0, output=str(output))
+    assert stats.processed == 0
+    assert output.read_bytes() == b""
+
+
+def test_url_for_list_valued_query():
+    request_data = {"path": "/a", "query_params": {"tag": ["x", "y"], "n": 1}}
+    assert _url_for(BASE_URL, request_data) == BASE_URL + "/a?tag=x&tag=y&n=1"
+    assert _url_for(BASE_URL, {"path": "/a"}) == BASE_URL + "/a"
+
+
+def malformed_requests():
+    return [
+        {"method": "GET", "path": 123},
+        {"method": "GET", "path": "/a", "query_params": ["x", "y"]},
+        {"method": "GET", "path": "/a", "query_params": "x=1"},
+        {"method": "POST", "path": None, "body": {}},
+    ]
+
+
+def test_url_for_rejects_malformed_requests():
+    for request_data in malformed_requests():
+        try:
+            _url_for(BASE_URL, request_data)
+        except ValueError as e:
+            assert "Malformed request" in str(e)
+        else:
+            raise AssertionError(f"accepted {request_data!r}")
+
+
+def test_malformed_requests_fail_individually():
+    # Nothing listens on port 9, so the one well-formed request fails to connect
+    base_url = "http://127.0.0.1:9"
+    requests_data = malformed_requests() + [{"method": "GET", "path": "/ok"}]
+
+    serial_results = []
+    replay_serial(requests_data, base_url, 0, serial_results.append)
+    async_results = []
+    run(replay_async(requests_data, base_url, 4, async_results.append))
+
+    for results in (serial_results, async_results):
+        assert len(results) == len(requests_data)
+        assert all(result.status is None for result in results)
+        assert sum("Malformed request" in result.detail for result in results) == 4
+
+
+def test_max_line_bytes_boundary(tmp_path):
+    def line_of(size, line_no):
+        prefix = json.dumps({"method": "GET", "path": "/", "line": line_no, "pad": ""})[:-2]
+        line = prefix + "x" * (size - len(prefix) - 2) + '"}'
+        assert len(line) == size
+        return line
+
+    max_line_bytes = 100
+    lines = [line_of(99, 1), line_of(100, 2), line_of(101, 3), line_of(100, 4), line_of(300, 5), line_of(100, 6)]
+    for trailing_newline in (True, False):
+        log_file = write_log(tmp_path, lines, trailing_newline)
+        errors = []
+        seen = [request_data["line"] for request_data in
+                iter_requests(log_file, lambda line_no, e: errors.append(line_no), max_line_bytes=max_line_bytes)]
+        # A line of exactly max_line_bytes is accepted, with or without its newline
+        assert seen == [1, 2, 4, 6]
+        assert errors == [3, 5]
+
+    # A final line one byte over the limit, with no newline, is still rejected
+    log_file = write_log(tmp_path, [line_of(100, 1), line_of(101, 2)], trailing_newline=False)
+    errors = []
+    seen = [request_data["line"] for request_data in
+            iter_requests(log_file, lambda line_no, e: errors.append(line_no), max_line_bytes=max_line_bytes)]
+    assert seen == [1]
+    assert errors == [2]